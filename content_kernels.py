@@ -0,0 +1,114 @@
+"""Hot-path analytic kernels for ContentAnalyzer.
+
+Consolidates the CPU-bound token analytics (trigram counting, keyword
+filtering, syllable counting) behind a small interface so the pure-Python
+implementations can be swapped for compiled ones. When numba is installed
+the syllable kernel is JIT-compiled over the raw byte buffer; otherwise a
+vectorized NumPy pass is used. Everything degrades to plain Python for
+non-ASCII input.
+"""
+from collections import Counter
+from typing import FrozenSet, List
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+_VOWEL_BYTES = np.frombuffer(b'aeiouy', dtype=np.uint8)
+
+# 128-entry lookup table: 1 for vowel byte values, 0 otherwise
+_VOWEL_LUT = bytes(1 if c in b'aeiouy' else 0 for c in range(128))
+
+def count_trigrams(words: List[str]) -> Counter:
+    """Count trigram frequencies over an already-tokenized word list"""
+    return Counter(zip(words, words[1:], words[2:]))
+
+def filter_keywords(words: List[str], stop_words: FrozenSet[str]) -> List[str]:
+    """Keep words longer than two characters that are not stop words"""
+    return [word for word in words
+            if len(word) > 2 and word not in stop_words]
+
+def count_word_syllables(word: str) -> int:
+    """Count syllables in a single word (pure-Python reference path)"""
+    data = word.lower().encode('ascii', 'ignore')
+    count = 0
+    prev = 0
+    for c in data:
+        # Branchless vowel-group-start test via the lookup table
+        v = _VOWEL_LUT[c]
+        count += v & (prev ^ 1)
+        prev = v
+    if data.endswith(b'e'):
+        count -= 1
+    if count <= 0:
+        count = 1
+    return count
+
+def _syllable_kernel(arr):
+    """Count syllables over a space-terminated lowercase ASCII byte array"""
+    total = 0
+    count = 0
+    prev_vowel = False
+    prev_char = 0
+    for i in range(arr.shape[0]):
+        c = arr[i]
+        if c == 32:  # space terminates the current word
+            if prev_char == 101:  # silent terminal 'e'
+                count -= 1
+            if count < 1:
+                count = 1
+            total += count
+            count = 0
+            prev_vowel = False
+            prev_char = 0
+        else:
+            is_vowel = (c == 97 or c == 101 or c == 105 or
+                        c == 111 or c == 117 or c == 121)
+            if is_vowel and not prev_vowel:
+                count += 1
+            prev_vowel = is_vowel
+            prev_char = c
+    return total
+
+if njit is not None:
+    _syllable_kernel = njit(cache=True)(_syllable_kernel)
+
+def _count_syllables_numpy(arr) -> int:
+    """Vectorized syllable count over a space-terminated byte array"""
+    vowel = np.isin(arr, _VOWEL_BYTES)
+
+    # A syllable starts wherever a vowel follows a non-vowel (or starts a word)
+    prev_vowel = np.concatenate(([False], vowel[:-1]))
+    starts = (vowel & ~prev_vowel).astype(np.int64)
+
+    # Per-word syllable counts via reduceat on word start offsets
+    space = arr == ord(' ')
+    word_starts = np.flatnonzero(np.concatenate(([True], space[:-1])))
+    counts = np.add.reduceat(starts, word_starts)
+
+    # Silent terminal 'e' adjustment, then floor each word at one syllable
+    word_ends = np.flatnonzero(space)
+    counts -= arr[word_ends - 1] == ord('e')
+    np.maximum(counts, 1, out=counts)
+    return int(counts.sum())
+
+def count_syllables(words: List[str]) -> int:
+    """Count syllables across all words with the fastest available kernel"""
+    if not words:
+        return 0
+
+    text = " ".join(words).lower()
+    try:
+        data = text.encode('ascii')
+    except UnicodeEncodeError:
+        # Fall back to the per-word counter for non-ASCII text
+        return sum(count_word_syllables(word) for word in words)
+
+    # Trailing space terminates the last word so every word has an end marker
+    arr = np.frombuffer(data + b' ', dtype=np.uint8)
+    if njit is not None:
+        return int(_syllable_kernel(arr))
+    return _count_syllables_numpy(arr)
@@ -26,13 +26,18 @@ if 'content_metrics' not in st.session_state:
 if 'ai_suggestions' not in st.session_state:
     st.session_state.ai_suggestions = None
 
+@st.cache_resource
+def get_content_analyzer():
+    """Create the content analyzer (and its model) once per process"""
+    return ContentAnalyzer()
+
 def analyze_website(url):
     """Perform website analysis and store results in session state"""
     with st.spinner("Analyzing website..."):
         try:
-            # Initialize analyzers
+            # Initialize analyzers (SEOAnalyzer holds per-URL state)
             seo_analyzer = SEOAnalyzer(url)
-            content_analyzer = ContentAnalyzer()
+            content_analyzer = get_content_analyzer()
 
             # Store analysis results in session state
             st.session_state.analyzed_url = url
@@ -40,12 +45,12 @@ def analyze_website(url):
             st.session_state.headers = seo_analyzer.analyze_headers()
             st.session_state.links = seo_analyzer.analyze_links()
             st.session_state.content_metrics = content_analyzer.analyze_content(
-                seo_analyzer.get_main_content()
+                seo_analyzer.main_content
             )
 
             # Pre-generate AI suggestions
             st.session_state.ai_suggestions = content_analyzer.get_ai_suggestions(
-                seo_analyzer.get_main_content(),
+                seo_analyzer.main_content,
                 st.session_state.meta_data
             )
 
@@ -1,8 +1,27 @@
 import json
 from typing import Dict, List, Any
-import requests
 from bs4 import BeautifulSoup
 
+from utils import get_session
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(raw: str) -> Any:
+    """Parse JSON with orjson when available, stdlib json otherwise"""
+    if orjson is not None:
+        # orjson rejects str subclasses such as bs4's NavigableString
+        return orjson.loads(str(raw))
+    return json.loads(raw)
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize JSON (2-space indented) with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
 class SchemaHandler:
     def __init__(self):
         self.supported_types = {
@@ -15,8 +34,8 @@ class SchemaHandler:
     def validate_schema(self, url: str) -> Dict[str, Any]:
         """Validate schema markup on a webpage"""
         try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = get_session().get(url, timeout=10)
+            soup = BeautifulSoup(response.text, 'lxml')
             
             # Find all schema markup
             schema_tags = soup.find_all('script', type='application/ld+json')
@@ -25,16 +44,17 @@ class SchemaHandler:
             
             for tag in schema_tags:
                 try:
-                    schema = json.loads(tag.string)
+                    schema = _json_loads(tag.string)
                     schemas.append(schema)
-                    
+
                     # Basic validation
                     if '@type' not in schema:
                         issues.append("Missing @type in schema")
                     if '@context' not in schema:
                         issues.append("Missing @context in schema")
-                        
-                except json.JSONDecodeError:
+
+                except ValueError:
+                    # Covers both json.JSONDecodeError and orjson.JSONDecodeError
                     issues.append("Invalid JSON-LD format")
                     
             return {
@@ -61,7 +81,7 @@ class SchemaHandler:
         
         return {
             "schema": schema,
-            "json_ld": f'<script type="application/ld+json">\n{json.dumps(schema, indent=2)}\n</script>'
+            "json_ld": f'<script type="application/ld+json">\n{_json_dumps(schema)}\n</script>'
         }
     
     def _generate_article_schema(self, data: Dict[str, Any]) -> Dict[str, Any]:
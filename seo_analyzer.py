@@ -1,67 +1,110 @@
-import requests
+from functools import cached_property
+import re
+
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 import trafilatura
 
+from utils import get_session
+
+# Matches all six header levels in one find_all filter
+_HEADER_RE = re.compile(r'^h[1-6]$')
+
 class SEOAnalyzer:
+    # Tags collected by the single DOM traversal in _walk()
+    _COLLECTED_TAGS = ['title', 'meta', 'link', 'a', _HEADER_RE]
+
     def __init__(self, url):
         self.url = url
-        self.response = requests.get(url, headers={'User-Agent': 'SEOAnalyzer/1.0'})
-        self.soup = BeautifulSoup(self.response.text, 'html.parser')
-        
+        self._host = urlsplit(url).netloc
+        self.response = get_session().get(url, headers={'User-Agent': 'SEOAnalyzer/1.0'}, timeout=10)
+        self.soup = BeautifulSoup(self.response.text, 'lxml')
+        self._walked = False
+        self._title = None
+        self._canonical = None
+        self._meta_tags = []
+        self._header_tags = []
+        self._anchor_tags = []
+        self._headers = None
+        self._links = None
+
+    def _walk(self):
+        """Collect all tags of interest in a single pass over the tree"""
+        if self._walked:
+            return
+
+        for tag in self.soup.find_all(self._COLLECTED_TAGS):
+            name = tag.name
+            if name == 'meta':
+                self._meta_tags.append(tag)
+            elif name == 'a':
+                if tag.get('href'):
+                    self._anchor_tags.append(tag)
+            elif name == 'link':
+                if self._canonical is None and 'canonical' in (tag.get('rel') or []):
+                    self._canonical = tag.get('href', '')
+            elif name == 'title':
+                if self._title is None:
+                    self._title = tag.string
+            else:
+                self._header_tags.append(tag)
+
+        self._walked = True
+
     def get_meta_info(self):
         """Extract meta information from the page"""
-        meta_info = {
-            "title": self.soup.title.string if self.soup.title else None,
-            "meta_description": None,
-            "meta_keywords": None,
-            "canonical": None,
-            "robots": None,
+        self._walk()
+
+        # One lowercased name -> content mapping, then pluck the keys of interest
+        metas = {meta.get('name', '').lower(): meta.get('content', '')
+                 for meta in self._meta_tags if meta.get('name')}
+
+        return {
+            "title": self._title,
+            "meta_description": metas.get('description'),
+            "meta_keywords": metas.get('keywords'),
+            "canonical": self._canonical,
+            "robots": metas.get('robots'),
             "status_code": self.response.status_code
         }
-        
-        for meta in self.soup.find_all('meta'):
-            if meta.get('name', '').lower() == 'description':
-                meta_info['meta_description'] = meta.get('content', '')
-            elif meta.get('name', '').lower() == 'keywords':
-                meta_info['meta_keywords'] = meta.get('content', '')
-            elif meta.get('name', '').lower() == 'robots':
-                meta_info['robots'] = meta.get('content', '')
-                
-        canonical = self.soup.find('link', {'rel': 'canonical'})
-        if canonical:
-            meta_info['canonical'] = canonical.get('href', '')
-            
-        return meta_info
-    
+
     def analyze_headers(self):
         """Analyze header tags (H1-H6)"""
-        headers = []
-        for i in range(1, 7):
-            for header in self.soup.find_all(f'h{i}'):
+        if self._headers is None:
+            self._walk()
+            headers = []
+            for header in self._header_tags:
+                # Split once to normalize whitespace across inline markup
+                # and newlines, then reuse the pieces for the word count
+                words = header.get_text().split()
                 headers.append({
-                    'type': f'H{i}',
-                    'content': header.get_text().strip(),
-                    'count': len(header.get_text().strip().split())
+                    'type': header.name.upper(),
+                    'content': ' '.join(words),
+                    'count': len(words)
                 })
-        return headers
-    
+            self._headers = headers
+        return self._headers
+
     def analyze_links(self):
         """Analyze links on the page"""
-        links = []
-        for link in self.soup.find_all('a'):
-            href = link.get('href')
-            if href:
-                absolute_url = urljoin(self.url, href)
+        if self._links is None:
+            self._walk()
+            links = []
+            for link in self._anchor_tags:
+                absolute_url = urljoin(self.url, link['href'])
                 links.append({
                     'text': link.get_text().strip(),
                     'url': absolute_url,
-                    'internal': self.url in absolute_url
+                    'internal': urlsplit(absolute_url).netloc == self._host
                 })
-        return links
-    
+            self._links = links
+        return self._links
+
+    @cached_property
+    def main_content(self):
+        """Main content extracted from the already-fetched page"""
+        return trafilatura.extract(self.response.text) or ""
+
     def get_main_content(self):
         """Get main content using trafilatura"""
-        downloaded = trafilatura.fetch_url(self.url)
-        text = trafilatura.extract(downloaded)
-        return text if text else ""
+        return self.main_content
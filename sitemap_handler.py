@@ -1,46 +1,262 @@
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from urllib import robotparser
 import xml.etree.ElementTree as ET
 from datetime import datetime
-from urllib.parse import urljoin
-import requests
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
 from bs4 import BeautifulSoup
+from lxml import etree
+
+from utils import get_session
+
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:
+    ScalableBloomFilter = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+_http2_client = None
+
+def _get_http2_client():
+    """Shared HTTP/2-capable client for HEAD checks, when httpx is installed
+
+    HTTP/2 lets the concurrent checks multiplex over one connection per
+    origin instead of one socket each. Returns None when httpx (or its h2
+    extra) is unavailable, in which case callers fall back to requests.
+    """
+    global _http2_client
+    if _http2_client is None and httpx is not None:
+        try:
+            _http2_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=10,
+                follow_redirects=True
+            )
+        except ImportError:  # the h2 extra is not installed
+            _http2_client = False
+    return _http2_client or None
+
+def _extract_hrefs(content):
+    """Extract the set of hrefs from a page's raw bytes
+
+    selectolax's C-based parser is used when installed (several times
+    faster than BeautifulSoup for pulling out anchors); otherwise fall
+    back to BeautifulSoup with the lxml backend.
+    """
+    if HTMLParser is not None:
+        hrefs = {node.attributes.get('href') for node in HTMLParser(content).css('a[href]')}
+    else:
+        hrefs = {link.get('href') for link in BeautifulSoup(content, 'lxml').find_all('a')}
+    hrefs.discard(None)
+    return hrefs
+
+def _make_visited():
+    """Membership structure for visited URLs
+
+    A scalable Bloom filter keeps memory roughly constant per URL on very
+    large crawls at the cost of a tiny false-positive rate; a plain set is
+    used when pybloom_live is not installed.
+    """
+    if ScalableBloomFilter is not None:
+        return ScalableBloomFilter(initial_capacity=100_000, error_rate=1e-4,
+                                   mode=ScalableBloomFilter.LARGE_SET_GROWTH)
+    return set()
+
+# Above this many URLs the crawl frontier moves to the disk-backed sieve
+_SIEVE_THRESHOLD = 100_000
+
+# Per-page byte budget for the crawl; link discovery rarely needs more
+_MAX_PAGE_BYTES = 2_000_000
+
+# (connect, read) timeout so one slow host cannot stall a whole run
+_TIMEOUT = (3.05, 10)
+
+# How many validation workers may hit the same host at once
+_PER_HOST_CONCURRENCY = 8
+
+# Non-page URLs the crawl skips: asset extensions and fragment links
+_EXCLUDE_RE = re.compile(r'\.(?:pdf|jpe?g|png|gif|css|js|ico)(?:$|\?)|#')
+
+# Recent HEAD-check results: url -> (timestamp, issue_or_None).
+# Re-validating the same sitemap within the TTL skips the network entirely.
+_CHECK_CACHE = {}
+_CHECK_CACHE_LOCK = threading.Lock()
+_CHECK_CACHE_TTL = 3600
+_CHECK_CACHE_MAX = 100_000
+
+@lru_cache(maxsize=8192)
+def _join_url(base, href):
+    """urljoin memoized for the repeated hrefs a crawl keeps seeing"""
+    return urljoin(base, href)
+
+@lru_cache(maxsize=8192)
+def _netloc(url):
+    """Host portion of a URL, memoized"""
+    return urlsplit(url).netloc
+
+def _url_hash(url):
+    """64-bit digest used as the sieve's fixed-size URL key"""
+    return hashlib.blake2b(url.encode(), digest_size=8).digest()
+
+class _Sieve:
+    """Mercator-style URL sieve: a deduplicating FIFO frontier.
+
+    URL hashes are buffered in memory and periodically merged against a
+    sorted on-disk file of known hashes in one sequential pass; only URLs
+    whose hash was previously unseen are re-emitted. This keeps frontier
+    memory bounded regardless of how many URLs the crawl discovers.
+    """
+
+    def __init__(self, buffer_size=1_000_000):
+        self._buffer_size = buffer_size
+        self._batch = []  # (hash, url) in arrival order, not yet merged
+        self._out = deque()
+        self._dir = tempfile.mkdtemp(prefix='sitemap-sieve-')
+        self._seen_path = os.path.join(self._dir, 'seen.bin')
+
+    def enqueue(self, url):
+        self._batch.append((_url_hash(url), url))
+        if len(self._batch) >= self._buffer_size:
+            self._flush()
+
+    def dequeue(self):
+        """Return the next unseen URL, or None when the frontier is empty"""
+        if not self._out:
+            self._flush()
+        if self._out:
+            return self._out.popleft()
+        return None
+
+    def close(self):
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def _flush(self):
+        if not self._batch:
+            return
+
+        unseen = self._merge(sorted(set(h for h, _ in self._batch)))
+
+        # Emit first occurrences of unseen URLs, preserving arrival order
+        emitted = set()
+        for h, url in self._batch:
+            if h in unseen and h not in emitted:
+                emitted.add(h)
+                self._out.append(url)
+        self._batch.clear()
+
+    def _merge(self, batch_hashes):
+        """Merge sorted batch hashes into the on-disk known set.
+
+        Single sequential pass over the sorted hash file; returns the set
+        of batch hashes that were not already known.
+        """
+        unseen = set()
+        new_path = self._seen_path + '.tmp'
+        try:
+            old = open(self._seen_path, 'rb')
+        except FileNotFoundError:
+            old = None
+
+        def read_old():
+            if old is None:
+                return None
+            chunk = old.read(8)
+            return chunk if chunk else None
+
+        with open(new_path, 'wb') as out:
+            current = read_old()
+            for h in batch_hashes:
+                while current is not None and current < h:
+                    out.write(current)
+                    current = read_old()
+                if current == h:
+                    out.write(current)
+                    current = read_old()
+                else:
+                    unseen.add(h)
+                    out.write(h)
+            while current is not None:
+                out.write(current)
+                current = read_old()
+
+        if old is not None:
+            old.close()
+        os.replace(new_path, self._seen_path)
+        return unseen
 
 class SitemapHandler:
     def __init__(self):
         self.urls = []
-        
-    def validate_sitemap(self, sitemap_url):
+        # Pooled session so checks against the same host reuse connections
+        self.session = get_session()
+        # robots.txt parsers, one per host crawled
+        self._robots_cache = {}
+
+    def _iter_locs(self, stream):
+        """Stream loc values out of a sitemap document with constant memory"""
+        for event, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag.endswith('}loc'):
+                yield elem.text
+            elem.clear()
+
+    def validate_sitemap(self, sitemap_url, force_refresh=False):
         """Validate an existing sitemap"""
         try:
-            response = requests.get(sitemap_url)
+            response = self.session.get(sitemap_url, stream=True, timeout=_TIMEOUT)
             if response.status_code != 200:
                 return {
                     "valid": False,
                     "error": f"Failed to fetch sitemap: Status code {response.status_code}"
                 }
-                
-            root = ET.fromstring(response.content)
-            urls = []
-            issues = []
-            
-            # Extract URLs and validate each
-            for url in root.findall(".//{http://www.sitemaps.org/schemas/sitemap/0.9}loc"):
-                url_str = url.text
-                urls.append(url_str)
-                
-                # Check if URL is accessible
-                try:
-                    url_response = requests.head(url_str, allow_redirects=True)
-                    if url_response.status_code != 200:
-                        issues.append({
-                            "url": url_str,
-                            "issue": f"URL returned status code {url_response.status_code}"
-                        })
-                except Exception as e:
-                    issues.append({
-                        "url": url_str,
-                        "issue": f"Failed to access URL: {str(e)}"
-                    })
-            
+
+            # Parse incrementally off the wire instead of building the full DOM
+            response.raw.decode_content = True
+            urls = list(self._iter_locs(response.raw))
+
+            # Group URLs by host so each worker runs sequential requests
+            # against one origin and keep-alive connections stay hot; large
+            # hosts are split into up to _PER_HOST_CONCURRENCY slices
+            buckets = defaultdict(list)
+            for url in urls:
+                buckets[_netloc(url)].append(url)
+
+            slices = []
+            for bucket in buckets.values():
+                workers = min(_PER_HOST_CONCURRENCY, len(bucket))
+                size = -(-len(bucket) // workers)
+                slices.extend(bucket[i:i + size]
+                              for i in range(0, len(bucket), size))
+
+            def check_slice(urls_slice):
+                return [self._check_url(url, force_refresh) for url in urls_slice]
+
+            with ThreadPoolExecutor(max_workers=50) as executor:
+                results = [result
+                           for slice_results in executor.map(check_slice, slices)
+                           for result in slice_results]
+
+            issues = [{"url": url, "issue": issue}
+                      for url, issue in results if issue is not None]
+
             return {
                 "valid": len(issues) == 0,
                 "total_urls": len(urls),
@@ -58,49 +274,195 @@ class SitemapHandler:
                 "error": str(e)
             }
     
-    def generate_sitemap(self, base_url, max_urls=500):
-        """Generate a sitemap for a website"""
-        self.urls = []
-        visited = set()
-        
-        def crawl(url):
-            if len(self.urls) >= max_urls or url in visited:
-                return
-                
-            visited.add(url)
+    def _check_url(self, url, force_refresh=False):
+        """HEAD-check a single URL, returning (url, issue_or_None)
+
+        Results are cached for an hour so repeated validation runs only
+        re-hit URLs whose result has gone stale; pass force_refresh to
+        bypass the cache.
+        """
+        if not force_refresh:
+            cached = _CHECK_CACHE.get(url)
+            if cached is not None and time.monotonic() - cached[0] < _CHECK_CACHE_TTL:
+                return url, cached[1]
+
+        try:
+            client = _get_http2_client()
+            if client is not None:
+                response = client.head(url)
+            else:
+                response = self.session.head(url, allow_redirects=True, timeout=_TIMEOUT)
+            if response.status_code != 200:
+                issue = f"URL returned status code {response.status_code}"
+            else:
+                issue = None
+        except Exception as e:
+            issue = f"Failed to access URL: {str(e)}"
+
+        # The check workers share this cache, so evict and insert under a
+        # lock to keep the eviction pick from racing concurrent inserts
+        with _CHECK_CACHE_LOCK:
+            if len(_CHECK_CACHE) >= _CHECK_CACHE_MAX:
+                _CHECK_CACHE.pop(next(iter(_CHECK_CACHE)), None)
+            _CHECK_CACHE[url] = (time.monotonic(), issue)
+        return url, issue
+
+    def _robots_for(self, url):
+        """Cached robots.txt parser for the url's host
+
+        robots.txt is fetched once per host through the pooled session
+        (with the usual timeout) rather than once per URL; hosts whose
+        robots.txt is missing or unreachable are treated as allow-all.
+        """
+        host = _netloc(url)
+        parser = self._robots_cache.get(host)
+        if parser is None:
+            parser = robotparser.RobotFileParser()
             try:
-                response = requests.get(url)
+                response = self.session.get(urljoin(url, '/robots.txt'), timeout=_TIMEOUT)
                 if response.status_code == 200:
-                    self.urls.append({
-                        "loc": url,
-                        "lastmod": datetime.now().strftime("%Y-%m-%d"),
-                        "priority": "0.8" if url == base_url else "0.5"
-                    })
-                    
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    for link in soup.find_all('a'):
-                        href = link.get('href')
-                        if href:
-                            absolute_url = urljoin(base_url, href)
-                            if (absolute_url.startswith(base_url) and 
-                                absolute_url not in visited and 
-                                not any(exclude in absolute_url for exclude in ['.pdf', '.jpg', '#'])):
-                                crawl(absolute_url)
+                    parser.parse(response.text.splitlines())
+                else:
+                    parser.allow_all = True
             except Exception:
-                pass
-                
-        crawl(base_url)
-        return self._generate_xml()
+                parser.allow_all = True
+            self._robots_cache[host] = parser
+        return parser
+
+    def _fetch_page(self, url):
+        """Fetch a page for the crawl, returning (url, html_bytes_or_None)
+
+        Streams the body and stops at the byte budget so an occasional
+        huge page cannot blow up per-request memory; non-HTML responses
+        are skipped without reading their bodies at all.
+        """
+        try:
+            if not self._robots_for(url).can_fetch('*', url):
+                return url, None
+            response = self.session.get(url, stream=True, timeout=_TIMEOUT)
+            with response:
+                if response.status_code != 200:
+                    return url, None
+                if not response.headers.get('Content-Type', '').startswith('text/html'):
+                    return url, None
+                return url, response.raw.read(_MAX_PAGE_BYTES, decode_content=True)
+        except Exception:
+            return url, None
+
+    def _process_page(self, url, content, base_url, enqueue, scheduled=None):
+        """Record a crawled page and hand its same-site links to enqueue
+
+        When a scheduled set is given, each extracted URL goes through the
+        join/filter work only the first time it is ever seen; boilerplate
+        header/footer links repeated on every page short-circuit here.
+        """
+        self.urls.append({
+            "loc": url,
+            "lastmod": datetime.now().strftime("%Y-%m-%d"),
+            "priority": "0.8" if url == base_url else "0.5"
+        })
+
+        # Parse the raw bytes directly; decoding to text is left to the parser
+        hrefs = _extract_hrefs(content)
+
+        base_netloc = _netloc(base_url)
+        for href in hrefs:
+            absolute_url = _join_url(base_url, href)
+            if scheduled is not None:
+                if absolute_url in scheduled:
+                    continue
+                scheduled.add(absolute_url)
+            # Same-origin by hostname, not by URL-string prefix
+            if (_netloc(absolute_url) == base_netloc and
+                not _EXCLUDE_RE.search(absolute_url)):
+                enqueue(absolute_url)
+
+    def generate_sitemap(self, base_url, max_urls=500, concurrency=20):
+        """Generate a sitemap for a website"""
+        self.urls = []
+
+        # Very large crawls dedup through the disk-backed sieve so frontier
+        # memory stays bounded; everything else uses the in-memory frontier
+        if max_urls > _SIEVE_THRESHOLD:
+            self._crawl_sieved(base_url, max_urls, concurrency)
+        else:
+            self._crawl(base_url, max_urls, concurrency)
+
+        # Callers (UI display, download) expect text
+        return self._generate_xml().decode('utf-8')
+
+    def _crawl(self, base_url, max_urls, concurrency):
+        """Breadth-first crawl with an in-memory frontier and visited set"""
+        visited = _make_visited()
+        frontier = deque([base_url])
+        scheduled = {base_url}
+
+        def schedule(url):
+            if url not in visited:
+                frontier.append(url)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while frontier and len(self.urls) < max_urls:
+                # Take the next batch of unvisited URLs off the frontier
+                batch = []
+                while (frontier and len(batch) < concurrency
+                       and len(self.urls) + len(batch) < max_urls):
+                    url = frontier.popleft()
+                    if url not in visited:
+                        visited.add(url)
+                        batch.append(url)
+                if not batch:
+                    continue
+
+                for url, content in executor.map(self._fetch_page, batch):
+                    if content is None:
+                        continue
+                    if len(self.urls) >= max_urls:
+                        break
+                    self._process_page(url, content, base_url, schedule, scheduled)
+
+    def _crawl_sieved(self, base_url, max_urls, concurrency):
+        """Breadth-first crawl with the out-of-core sieve as its frontier"""
+        sieve = _Sieve()
+        sieve.enqueue(base_url)
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                while len(self.urls) < max_urls:
+                    # The sieve only ever emits a URL once, so no visited set
+                    batch = []
+                    while (len(batch) < concurrency
+                           and len(self.urls) + len(batch) < max_urls):
+                        url = sieve.dequeue()
+                        if url is None:
+                            break
+                        batch.append(url)
+                    if not batch:
+                        break
+
+                    for url, content in executor.map(self._fetch_page, batch):
+                        if content is None:
+                            continue
+                        if len(self.urls) >= max_urls:
+                            break
+                        self._process_page(url, content, base_url, sieve.enqueue)
+        finally:
+            sieve.close()
     
     def _generate_xml(self):
-        """Generate XML sitemap from collected URLs"""
-        root = ET.Element("urlset")
-        root.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
-        
-        for url_data in self.urls:
-            url_element = ET.SubElement(root, "url")
-            for key, value in url_data.items():
-                element = ET.SubElement(url_element, key)
-                element.text = value
-                
-        return ET.tostring(root, encoding='unicode', method='xml')
+        """Generate XML sitemap bytes from collected URLs
+
+        Uses lxml's incremental writer so each url element is serialized
+        and released as it is written, instead of holding a full element
+        tree plus its serialized form in memory at once.
+        """
+        buf = io.BytesIO()
+        with etree.xmlfile(buf, encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element('urlset',
+                            nsmap={None: "http://www.sitemaps.org/schemas/sitemap/0.9"}):
+                for url_data in self.urls:
+                    with xf.element('url'):
+                        for key, value in url_data.items():
+                            with xf.element(key):
+                                xf.write(value)
+        return buf.getvalue()
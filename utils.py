@@ -1,30 +1,87 @@
+import csv
 import pandas as pd
 import io
 import re
 from urllib.parse import urlparse
 
-def export_to_csv(data):
-    """Convert analysis data to CSV format"""
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+_session = None
+
+def get_session():
+    """Shared HTTP session with connection pooling and retries
+
+    Reusing one session keeps TLS connections alive across the multiple
+    requests a single analysis makes (page fetch, schema validation,
+    competitor fetches), avoiding a handshake per request.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+    return _session
+
+# Columns the analyzers emit, fixed here so pandas skips inference
+_HEADER_COLS = ('type', 'content', 'count')
+_LINK_COLS = ('text', 'url', 'internal')
+
+def export_to_csv(data, columns=None):
+    """Convert analysis data to CSV format
+
+    columns may pre-specify a (header_columns, link_columns) pair; by
+    default the known analyzer columns are used, which skips pandas
+    dtype/column inference on every call.
+    """
+    header_cols, link_cols = columns or (_HEADER_COLS, _LINK_COLS)
     output = io.StringIO()
-    
-    # Export meta information
-    meta_df = pd.DataFrame([data['meta']])
-    meta_df.to_csv(output, index=False)
+
+    # Meta is a single row, so plain csv.writer beats building a DataFrame
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(data['meta'].keys())
+    writer.writerow(data['meta'].values())
     output.write("\n\nHeader Analysis\n")
-    
+
     # Export headers
-    headers_df = pd.DataFrame(data['headers'])
-    headers_df.to_csv(output, index=False)
+    headers_df = pd.DataFrame.from_records(data['headers'], columns=list(header_cols))
+    headers_df.to_csv(output, index=False, lineterminator='\n')
     output.write("\n\nLinks Analysis\n")
-    
+
     # Export links
-    links_df = pd.DataFrame(data['links'])
-    links_df.to_csv(output, index=False)
-    
+    links_df = pd.DataFrame.from_records(data['links'], columns=list(link_cols))
+    links_df.to_csv(output, index=False, lineterminator='\n')
+
+    return output.getvalue()
+
+def export_many(rows, columns=_LINK_COLS):
+    """Export many records in one CSV with a single header row
+
+    Intended for bulk audits where per-page exports would repeat the
+    header and pandas setup for every page.
+    """
+    output = io.StringIO()
+    df = pd.DataFrame.from_records(rows, columns=list(columns))
+    df.to_csv(output, index=False, lineterminator='\n')
     return output.getvalue()
 
-def validate_url(url):
-    """Validate URL format"""
+# Fast-path URL shape check: scheme, a sane first host character, no whitespace
+_URL_RE = re.compile(r'^https?://[^\s/$.?#].[^\s]*$', re.I)
+
+def validate_url(url, strict=False):
+    """Validate URL format
+
+    The default path is a single compiled-regex match, cheap enough to run
+    on every extracted link; strict=True keeps the urlparse-based check
+    for edge cases the pattern is too coarse for.
+    """
+    if not strict:
+        return bool(_URL_RE.match(url))
     try:
         result = urlparse(url)
         return all([result.scheme, result.netloc]) and result.scheme in ['http', 'https']